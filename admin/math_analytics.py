@@ -3,8 +3,9 @@ import re
 from typing import Dict, List, Tuple, Set, Optional
 import numpy as np
 from pathlib import Path
-from mlx_lm import load, generate
+from mlx_lm import generate
 from config import settings
+from transcribe.summarize_model import get_model_and_tokenizer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -47,14 +48,11 @@ class MathLectureAnalyzer:
             return []
 
     def _init_phi4(self):
-        """Initialize Phi-4 model"""
-        try:
-            model, tokenizer = load(settings.MLX_MODEL_NAME)
-            logger.info("Successfully initialized Phi-4 model")
-            return model, tokenizer
-        except Exception as e:
-            logger.error(f"Error loading Phi-4 model: {e}")
-            return None, None
+        """Initialize Phi-4 model, shared with the summarizer's process-wide cache"""
+        model, tokenizer = get_model_and_tokenizer()
+        if model is None or tokenizer is None:
+            logger.error(f"Error loading Phi-4 model: {settings.MLX_MODEL_NAME}")
+        return model, tokenizer
 
     def _generate_phi4_analysis(self, prompt: str) -> str:
         """Generate analysis using Phi-4"""
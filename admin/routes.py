@@ -4,6 +4,9 @@ import json
 from . import admin_bp
 from config import settings
 
+# Amount of log history returned by the admin log view
+LOG_TAIL_BYTES = 1 << 20
+
 @admin_bp.route('/api/lecture/<lecture_name>')
 def get_lecture_stats(lecture_name):
     """Get stats for a specific lecture"""
@@ -60,6 +63,31 @@ def get_stats_data():
         print(f"Error reading stats directory: {e}")
         return None
 
+def tail_log(path: Path, n_bytes: int = LOG_TAIL_BYTES) -> str:
+    """Return the end of a log file without reading the whole file"""
+    size = path.stat().st_size
+    with path.open('rb') as f:
+        f.seek(max(0, size - n_bytes))
+        data = f.read()
+    text = data.decode('utf-8', errors='replace')
+    if size > n_bytes:
+        # Drop the partial first line left by seeking into the middle of the file
+        text = text.split('\n', 1)[-1]
+    return text
+
+@admin_bp.route('/logs')
+def view_logs():
+    """Return the most recent application log entries (development only)"""
+    # The log holds tracebacks, paths and upload names; never serve it from a public deployment
+    if not settings.is_development:
+        return jsonify({'error': 'Log view is only available in development'}), 403
+    try:
+        return jsonify({'log': tail_log(Path(settings.LOG_FILE))}), 200
+    except FileNotFoundError:
+        return jsonify({'error': 'Log file not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/')
 def admin_dashboard():
     """Render the admin dashboard template"""
@@ -1,12 +1,17 @@
 import os
 import sys
+import json
+import signal
+import threading
 import logging
 import logging.handlers
 import traceback
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional, Tuple, Dict, Any, List
 from flask import send_from_directory, session
 from pathlib import Path
+from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 from flask import Flask, request, jsonify, render_template
@@ -24,30 +29,57 @@ from flask_cors import CORS
 OLLAMA_BASE_URL = 'http://localhost:11434'
 OLLAMA_TIMEOUT = 120  # Increased timeout for model operations
 OLLAMA_RETRY_ATTEMPTS = 3
+OLLAMA_POOL_SIZE = 16  # Keep-alive connections shared by concurrent chat requests
 
+# Shared session so Ollama calls reuse keep-alive connections
+ollama_session = requests.Session()
+ollama_session.mount(
+    OLLAMA_BASE_URL,
+    HTTPAdapter(pool_connections=OLLAMA_POOL_SIZE, pool_maxsize=OLLAMA_POOL_SIZE)
+)
 
+# Console records buffered between writes in production
+CONSOLE_LOG_CAPACITY = 256
 
 
-def init_directories():
-    """Initialize all required directories including logs"""
-    log_dir = Path('logs')
-    os.makedirs(log_dir, exist_ok=True)
-    try:
-        log_dir.chmod(0o755)
-    except Exception as e:
-        print(f"Warning: Could not set log directory permissions: {e}")
+class BufferedConsoleHandler(logging.handlers.MemoryHandler):
+    """Buffer console records and write each batch with a single stream flush"""
+
+    def flush(self):
+        with self.lock:
+            if self.target is None or not self.buffer:
+                return
+            stream = self.target.stream
+            for record in self.buffer:
+                try:
+                    stream.write(self.target.format(record) + self.target.terminator)
+                except Exception:
+                    self.target.handleError(record)
+            stream.flush()
+            self.buffer.clear()
+
+
+def _install_sigterm_flush():
+    """Flush log handlers on SIGTERM, then hand over to the previously installed handler"""
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def flush_then_previous(signum, frame):
+        for handler in logging.getLogger().handlers:
+            handler.flush()
+        if callable(previous):
+            # e.g. gunicorn's graceful worker exit
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
 
-# Initialize directories before importing settings
-init_directories()
+    signal.signal(signal.SIGTERM, flush_then_previous)
 
 
 def setup_logging():
     """Configure application logging with rotation and proper permissions"""
     try:
-        # Application logs
-        log_dir = Path(settings.LOG_FILE).parent
-        os.makedirs(log_dir, exist_ok=True)
-
+        # Application logs; Settings already created the log directory
         root_logger = logging.getLogger()
         root_logger.setLevel(getattr(logging, settings.LOG_LEVEL))
 
@@ -61,6 +93,17 @@ def setup_logging():
 
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+        if settings.is_production:
+            # Batch console output; errors and shutdown still flush immediately
+            if hasattr(sys.stdout, 'reconfigure'):
+                sys.stdout.reconfigure(line_buffering=False, write_through=False)
+            console_handler = BufferedConsoleHandler(
+                capacity=CONSOLE_LOG_CAPACITY,
+                target=console_handler
+            )
+            # Default SIGTERM skips atexit, which would drop the buffered records
+            if threading.current_thread() is threading.main_thread():
+                _install_sigterm_flush()
 
         root_logger.addHandler(file_handler)
         root_logger.addHandler(console_handler)
@@ -111,7 +154,7 @@ TRANSCRIPTS_DIR = settings.OUTPUT_DIRS["transcripts"]
 def check_ollama_status() -> bool:
     """Check if Ollama service is running and responding"""
     try:
-        response = requests.get(f'{OLLAMA_BASE_URL}/api/tags', timeout=5)
+        response = ollama_session.get(f'{OLLAMA_BASE_URL}/api/tags', timeout=5)
         return response.ok
     except:
         return False
@@ -119,7 +162,7 @@ def check_ollama_status() -> bool:
 def check_model_availability(model_name: str) -> bool:
     """Check if specified model is available in Ollama"""
     try:
-        response = requests.post(
+        response = ollama_session.post(
             f'{OLLAMA_BASE_URL}/api/show',
             json={"name": model_name},
             timeout=5
@@ -150,14 +193,29 @@ def query_ollama(prompt: str, retries: int = OLLAMA_RETRY_ATTEMPTS) -> str:
 
     for attempt in range(retries):
         try:
-            response = requests.post(
+            # Stream so the timeout applies between tokens, not to the whole answer
+            response = ollama_session.post(
                 f'{OLLAMA_BASE_URL}/api/generate',
-                json={"model": "phi4:latest", "prompt": prompt, "stream": False},
-                timeout=OLLAMA_TIMEOUT
+                json={"model": "phi4:latest", "prompt": prompt, "stream": True},
+                timeout=OLLAMA_TIMEOUT,
+                stream=True
             )
-            response.raise_for_status()
-            data = response.json()
-            return data.get('response', 'No response received')
+            try:
+                response.raise_for_status()
+                parts = []
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get('error'):
+                        # Ollama reports mid-stream failures as an error line
+                        return f"Error: {data['error']}"
+                    parts.append(data.get('response', ''))
+                    if data.get('done'):
+                        break
+            finally:
+                response.close()
+            return ''.join(parts) or 'No response received'
         except requests.ConnectionError:
             if attempt == retries - 1:
                 return "Error connecting to Ollama"
@@ -248,7 +306,9 @@ def chat_with_ollama():
         
         # Configure chat logging for this session
         chat_logger = logging.getLogger('chat')
-        chat_file_handler = logging.FileHandler(f'logs/{chat_file}')
+        # Client-supplied name: keep it a plain file inside the log directory
+        chat_file = secure_filename(str(chat_file)) or 'chat_history.log'
+        chat_file_handler = logging.FileHandler(Path(settings.LOG_FILE).parent / chat_file)
         chat_file_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
         chat_logger.addHandler(chat_file_handler)
         
@@ -289,7 +349,7 @@ def validate_file(file) -> Optional[str]:
     if '.' not in file.filename:
         return "Invalid file format"
     ext = file.filename.rsplit('.', 1)[1].lower()
-    if ext not in settings.ALLOWED_EXTENSIONS:
+    if ext not in settings.allowed_extensions:
         return "File type not allowed"
     return None
 
@@ -303,11 +363,25 @@ def process_video_endpoint() -> Tuple[Dict[str, Any], int]:
     """Process video upload endpoint"""
     file_path = None
     try:
-        if 'file' not in request.files:
+        if request.mimetype == 'application/octet-stream':
+            # Raw body upload: skips multipart parsing, filename comes from a header
+            if not request.content_length:
+                # Chunked or empty bodies can't be size-checked and would save an empty file
+                logger.error("Raw upload without Content-Length")
+                return jsonify({'error': 'Content-Length required'}), 400
+            file = FileStorage(
+                stream=request.stream,
+                filename=request.headers.get('X-Filename', ''),
+                content_length=request.content_length
+            )
+            form = request.args
+        elif 'file' not in request.files:
             logger.error("No file in request")
             return jsonify({'error': 'No file selected'}), 400
+        else:
+            file = request.files['file']
+            form = request.form
         
-        file = request.files['file']
         if not file.filename:
             logger.error("Empty filename")
             return jsonify({'error': 'No file selected'}), 400
@@ -317,7 +391,7 @@ def process_video_endpoint() -> Tuple[Dict[str, Any], int]:
             logger.error(f"File validation error: {error}")
             return jsonify({'error': error}), 400
 
-        title = request.form.get('title', Path(file.filename).stem)
+        title = form.get('title', Path(file.filename).stem)
         
         try:
             filename = secure_filename(file.filename)
@@ -410,9 +484,6 @@ def handle_exception(e):
     }), 500
 
 if __name__ == '__main__':
-    for directory in settings.OUTPUT_DIRS.values():
-        os.makedirs(directory, exist_ok=True)
-    
     logger.info(f"Starting server on {settings.HOST}:{settings.PORT}")
     logger.info(f"Debug mode: {settings.DEBUG}")
     CORS(app)
@@ -1,5 +1,6 @@
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, TypedDict, Any
+from typing import Dict, FrozenSet, List, Set, TypedDict, Any
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import os 
 
@@ -32,6 +33,7 @@ class Settings(BaseSettings):
     # Model configuration
     WHISPER_PATH: str = "/Users/vincent/development/whisper.cpp/main"
     WHISPER_MODEL_PATH: str = "/Users/vincent/development/whisper.cpp/models/ggml-large-v3.bin"
+    WHISPER_THREADS: int = min(8, os.cpu_count() or 4)  # whisper.cpp itself defaults to 4
     MLX_MODEL_NAME: str = "mlx-community/phi-4-8bit"
     WINDOW_SIZE: int = 4096
     
@@ -74,24 +76,35 @@ class Settings(BaseSettings):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._init_directories()
-        self._validate_paths()
     
     def _init_directories(self) -> None:
         """Initialize all required directories"""
-        # Create logs directory
-        os.makedirs(self.BASE_DIR / "logs", exist_ok=True)
-        
-        # Create all output directories
-        for directory in self.OUTPUT_DIRS.values():
-            os.makedirs(directory, exist_ok=True)
-    
-    def _validate_paths(self) -> None:
-        """Validate critical paths and executables"""
-        if self.APP_ENV != "testing":
-            if not os.path.isfile(self.WHISPER_PATH):
-                raise ValueError(f"Whisper executable not found at {self.WHISPER_PATH}")
-            if not os.path.isfile(self.WHISPER_MODEL_PATH):
-                raise ValueError(f"Whisper model not found at {self.WHISPER_MODEL_PATH}")
+        self.ensure_dirs({Path(self.LOG_FILE).parent, *self.OUTPUT_DIRS.values()})
+    
+    @classmethod
+    def ensure_dirs(cls, directories: Set[Path]) -> None:
+        """Create each unique directory exactly once, shallowest paths first"""
+        for directory in sorted({Path(d) for d in directories}, key=lambda p: len(p.parts)):
+            directory.mkdir(parents=True, exist_ok=True)
+    
+    @cached_property
+    def whisper_path(self) -> str:
+        """Whisper executable path, validated with the model on first use"""
+        if not os.path.isfile(self.WHISPER_PATH):
+            raise FileNotFoundError(f"Whisper executable not found at {self.WHISPER_PATH}")
+        if not os.path.isfile(self.WHISPER_MODEL_PATH):
+            raise FileNotFoundError(f"Whisper model not found at {self.WHISPER_MODEL_PATH}")
+        return self.WHISPER_PATH
+    
+    @cached_property
+    def allowed_extensions(self) -> FrozenSet[str]:
+        """
+        Lowercased ALLOWED_EXTENSIONS as a set for constant-time lookups.
+
+        Computed on first access and cached: reassigning ALLOWED_EXTENSIONS
+        afterwards does not refresh it until `del settings.allowed_extensions`.
+        """
+        return frozenset(ext.lower() for ext in self.ALLOWED_EXTENSIONS)
     
     @property
     def is_development(self) -> bool:
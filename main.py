@@ -2,8 +2,9 @@ import argparse
 import os
 import sys
 import logging
+import threading
 import traceback
-from transcribe.summarize_model import save_summaries, split_text, summarize_in_parallel
+from concurrent.futures import ThreadPoolExecutor
 from transcribe.transcribe import transcribe
 from transcribe.get_video import convert_to_wav, process_local_video
 from transcribe.utils import get_filename
@@ -12,6 +13,7 @@ from transcribe.utils import get_filename
 LOG_FILE = "transcribe.log"
 SUMMARIES_DIR = "files/summaries"
 LOGSEQ_DIR = "files/logseq"
+MAX_AUDIO_IN_FLIGHT = 2  # WAV files converted but not yet transcribed
 
 # Configure logging to both file and console
 def setup_logging():
@@ -32,34 +34,42 @@ def setup_logging():
     root_logger.addHandler(file_handler)
     root_logger.addHandler(console_handler)
 
+def _nonempty(path):
+    """Returns True if path is an existing, non-empty file, using a single stat."""
+    try:
+        return os.stat(path).st_size > 0
+    except FileNotFoundError:
+        return False
+
 def create_logseq_note(summary_path, title):
     """Creates a Logseq note from a summary file."""
     if not os.path.exists(summary_path):
         raise FileNotFoundError(f"Summary file not found: {summary_path}")
         
-    with open(summary_path, "r") as f:
-        lines = f.readlines()
-        
-    if not lines:
+    if os.path.getsize(summary_path) == 0:
         raise ValueError(f"Summary file is empty: {summary_path}")
 
-    formatted_lines = ["    " + line for line in lines]
-
     summary_filename = os.path.basename(summary_path)
     logseq_filename = os.path.splitext(summary_filename)[0] + ".md"
     logseq_note_path = os.path.join(LOGSEQ_DIR, logseq_filename)
     os.makedirs(os.path.dirname(logseq_note_path), exist_ok=True)
 
-    with open(logseq_note_path, "w") as f:
-        f.write(f"- summarized [[{title}]]\n")
-        f.write("- [[summary]]\n")
-        f.writelines(formatted_lines)
+    # Stream the summary into the note, indenting each line
+    with open(summary_path, "r") as src, open(logseq_note_path, "w") as dst:
+        dst.write(f"- summarized [[{title}]]\n")
+        dst.write("- [[summary]]\n")
+        for line in src:
+            dst.write("    ")
+            dst.write(line)
     
     logging.info(f"✓ Created Logseq note: {logseq_note_path}")
     return logseq_note_path
 
-def call_mlx_model(text_path, title):
+def call_mlx_model(text_path, title, max_tokens=None):
     """Summarizes text using the MLX model."""
+    # Deferred so that mlx_lm and spaCy only load when summarizing
+    from transcribe.summarize_model import save_summaries, split_text, summarize_in_parallel
+
     if not os.path.exists(text_path):
         raise FileNotFoundError(f"Text file not found: {text_path}")
         
@@ -70,7 +80,7 @@ def call_mlx_model(text_path, title):
             raise ValueError(f"Text file is empty: {text_path}")
 
         logging.info("Starting text splitting...")
-        chunks = split_text(text_path=text_path, title=title)
+        chunks = split_text(text_path=text_path, title=title, max_tokens=max_tokens)
         if not chunks:
             raise RuntimeError("Text splitting produced no chunks")
         logging.info(f"✓ Split text into {len(chunks)} chunks")
@@ -83,7 +93,7 @@ def call_mlx_model(text_path, title):
         summary_path = save_summaries(summaries, filename_only)
         logging.info(f"✓ Created summary: {summary_path}")
         
-        if not os.path.exists(summary_path) or os.path.getsize(summary_path) == 0:
+        if not _nonempty(summary_path):
             raise RuntimeError(f"Summary file is empty or missing: {summary_path}")
             
         return summary_path
@@ -93,33 +103,46 @@ def call_mlx_model(text_path, title):
         logging.debug(traceback.format_exc())
         raise
 
-def process_local(input_path, title):
-    """Processes a local video file."""
+def convert_stage(input_path):
+    """Converts a local video file to WAV audio."""
     if not os.path.isfile(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
 
+    logging.info(f"Converting video to audio: {input_path}")
+    audio_path = process_local_video(input_path)
+    if not _nonempty(audio_path):
+        raise RuntimeError(f"Audio extraction failed or produced empty file: {audio_path}")
+    logging.info(f"✓ Created audio file: {audio_path}")
+    return audio_path
+
+def transcribe_stage(audio_path):
+    """Transcribes a WAV file with whisper.cpp."""
+    logging.info(f"Starting transcription of {audio_path} (this may take several minutes)...")
+    elapsed_time, transcript, transcript_path = transcribe(audio_path)
+    if not _nonempty(transcript_path):
+        raise RuntimeError(f"Transcription failed or produced empty file: {transcript_path}")
+    logging.info(f"✓ Completed transcription in {elapsed_time} seconds")
+    logging.info(f"✓ Created transcript: {transcript_path}")
+    return transcript_path
+
+def summarize_stage(transcript_path, title, max_tokens=None):
+    """Summarizes a transcript and writes the Logseq note."""
+    logging.info(f"Starting summarization of {transcript_path}...")
+    summary_path = call_mlx_model(transcript_path, title, max_tokens)
+    logging.info("✓ Completed summarization")
+
+    logging.info("Creating Logseq note...")
+    logseq_path = create_logseq_note(summary_path, title)
+    return summary_path, logseq_path
+
+def process_local(input_path, title, max_tokens=None):
+    """Processes a local video file."""
     logging.info(f"Starting processing of: {input_path}")
     
     try:
-        logging.info("Converting video to audio...")
-        audio_path = process_local_video(input_path)
-        if not os.path.exists(audio_path) or os.path.getsize(audio_path) == 0:
-            raise RuntimeError(f"Audio extraction failed or produced empty file: {audio_path}")
-        logging.info(f"✓ Created audio file: {audio_path}")
-
-        logging.info("Starting transcription (this may take several minutes)...")
-        elapsed_time, transcript, transcript_path = transcribe(audio_path)
-        if not os.path.exists(transcript_path) or os.path.getsize(transcript_path) == 0:
-            raise RuntimeError(f"Transcription failed or produced empty file: {transcript_path}")
-        logging.info(f"✓ Completed transcription in {elapsed_time} seconds")
-        logging.info(f"✓ Created transcript: {transcript_path}")
-
-        logging.info("Starting summarization...")
-        summary_path = call_mlx_model(transcript_path, title)
-        logging.info("✓ Completed summarization")
-        
-        logging.info("Creating Logseq note...")
-        logseq_path = create_logseq_note(summary_path, title)
+        audio_path = convert_stage(input_path)
+        transcript_path = transcribe_stage(audio_path)
+        summary_path, logseq_path = summarize_stage(transcript_path, title, max_tokens)
         
         logging.info("\nProcessing completed successfully!")
         logging.info("Generated files:")
@@ -133,18 +156,83 @@ def process_local(input_path, title):
         logging.debug(traceback.format_exc())
         raise
 
+def _convert_when_free(input_path, audio_slots):
+    """Waits for a free audio slot, then converts the video."""
+    audio_slots.acquire()
+    return convert_stage(input_path)
+
+def _transcribe_and_free(audio_future, audio_slots):
+    """Transcribes converted audio and frees its slot, even on failure."""
+    try:
+        return transcribe_stage(audio_future.result())
+    finally:
+        audio_slots.release()
+
+def _summarize_when_ready(transcript_future, title, max_tokens):
+    """Summarizes a transcript once its transcription has finished."""
+    return summarize_stage(transcript_future.result(), title, max_tokens)
+
+def process_videos(input_paths, max_tokens=None):
+    """Processes several local videos as a pipeline and returns the paths that failed."""
+    # Output files are named after the input stem, so two "lec.mp4"s in flight would overwrite each other
+    stems = [get_filename(path) for path in input_paths]
+    duplicates = sorted({stem for stem in stems if stems.count(stem) > 1})
+    if duplicates:
+        raise ValueError(f"Input files share a name, rename them first: {', '.join(duplicates)}")
+
+    # One worker per stage: video N+1 converts while N transcribes and N-1 is summarized
+    failed = []
+    audio_slots = threading.BoundedSemaphore(MAX_AUDIO_IN_FLIGHT)
+    with ThreadPoolExecutor(max_workers=1) as convert_pool, \
+         ThreadPoolExecutor(max_workers=1) as transcribe_pool, \
+         ThreadPoolExecutor(max_workers=1) as summarize_pool:
+        pipeline = []
+        for input_path in input_paths:
+            audio_future = convert_pool.submit(_convert_when_free, input_path, audio_slots)
+            transcript_future = transcribe_pool.submit(_transcribe_and_free, audio_future, audio_slots)
+            summary_future = summarize_pool.submit(
+                _summarize_when_ready, transcript_future, get_filename(input_path), max_tokens
+            )
+            pipeline.append((input_path, summary_future))
+
+        for input_path, summary_future in pipeline:
+            try:
+                summary_path, logseq_path = summary_future.result()
+                logging.info(f"✓ Finished {input_path}: {summary_path}, {logseq_path}")
+            except Exception as e:
+                logging.error(f"Processing failed for {input_path}: {str(e)}")
+                logging.debug(traceback.format_exc())
+                failed.append(input_path)
+
+    logging.info(f"Processed {len(input_paths) - len(failed)}/{len(input_paths)} videos")
+    return failed
+
+def positive_int(value):
+    """Parses a strictly positive integer CLI argument."""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
 if __name__ == "__main__":
     # Set up logging before anything else
     setup_logging()
     
     parser = argparse.ArgumentParser(description="Process local video files.")
-    parser.add_argument("--input_path", type=str, help="Path to the local video file", required=True)
-    parser.add_argument("--title", type=str, help="Title of the video", required=True)
+    parser.add_argument("--input_path", type=str, nargs="+", help="Path(s) to local video files", required=True)
+    parser.add_argument("--title", type=str, help="Title of the video (single input only, defaults to the filename)")
+    parser.add_argument("--max_tokens", type=positive_int, help="Token budget per summary chunk (default: fill the model window)")
 
     args = parser.parse_args()
+    if args.title and len(args.input_path) > 1:
+        parser.error("--title can only be used with a single --input_path")
 
     try:
-        process_local(args.input_path, args.title)
+        if len(args.input_path) == 1:
+            input_path = args.input_path[0]
+            process_local(input_path, args.title or get_filename(input_path), args.max_tokens)
+        elif process_videos(args.input_path, args.max_tokens):
+            sys.exit(1)
     except Exception as e:
         logging.error(f"Error: {str(e)}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -0,0 +1,67 @@
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+from werkzeug.serving import make_server
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from app import app
+from config import settings
+
+# Set before any test snapshots app.config, so restores keep them
+app.config['TESTING'] = True
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_app():
+    """Pay the first-request cost once per worker, before any test is timed"""
+    # Finalizes the URL map and compiles the page templates
+    warm_client = app.test_client()
+    for path in ('/status', '/', '/chat'):
+        warm_client.get(path)
+
+@pytest.fixture(scope="session")
+def client():
+    """Create one test client for the whole session"""
+    # No `with` block: a preserved request context would leak between tests
+    return app.test_client()
+
+@pytest.fixture(scope="session")
+def live_server():
+    """Serve the app on an ephemeral port for tests that need real HTTP concurrency"""
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    thread.join()
+
+@pytest.fixture(autouse=True)
+def restore_app_config():
+    """Snapshot app.config so per-test changes don't leak into the shared client"""
+    original = dict(app.config)
+    yield
+    app.config.clear()
+    app.config.update(original)
+
+@pytest.fixture(scope="session")
+def process_url():
+    """URL of the video processing endpoint"""
+    return f'{settings.API_PREFIX}/process'
+
+@pytest.fixture(scope="session")
+def _mock_payload():
+    """Bytes shared by every mock video upload"""
+    return b'mock video content'
+
+@pytest.fixture(scope="session")
+def mock_video_file(_mock_payload):
+    """Filename and bytes for a mock video upload"""
+    return SimpleNamespace(filename='test_video.mp4', content=_mock_payload)
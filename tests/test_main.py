@@ -0,0 +1,98 @@
+import argparse
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+import main
+from main import process_videos
+
+@pytest.fixture
+def stage_log():
+    """Patch the three pipeline stages with fakes that record their calls"""
+    calls = []
+    lock = threading.Lock()
+
+    def record(*entry):
+        with lock:
+            calls.append(entry)
+
+    def convert(input_path):
+        record('convert', input_path)
+        if 'broken' in input_path:
+            raise RuntimeError("ffmpeg failed")
+        return f"{input_path}.wav"
+
+    def transcribe(audio_path):
+        record('transcribe', audio_path)
+        return f"{audio_path}.txt"
+
+    def summarize(transcript_path, title, max_tokens=None):
+        record('summarize', transcript_path, title, max_tokens)
+        return f"{transcript_path}.summary", f"{transcript_path}.md"
+
+    with patch('main.convert_stage', side_effect=convert), \
+         patch('main.transcribe_stage', side_effect=transcribe), \
+         patch('main.summarize_stage', side_effect=summarize):
+        yield calls
+
+def test_process_videos_stage_order(stage_log):
+    """Test each video runs convert -> transcribe -> summarize"""
+    videos = ['a.mp4', 'b.mp4', 'c.mp4']
+    assert process_videos(videos, max_tokens=512) == []
+
+    for video in videos:
+        stages = [entry for entry in stage_log if entry[1].startswith(video)]
+        assert stages == [
+            ('convert', video),
+            ('transcribe', f"{video}.wav"),
+            ('summarize', f"{video}.wav.txt", video[0], 512),
+        ]
+
+def test_process_videos_failure_does_not_stop_others(stage_log):
+    """Test a failed video is reported while the rest still finish"""
+    failed = process_videos(['a.mp4', 'broken.mp4', 'c.mp4'])
+
+    assert failed == ['broken.mp4']
+    summarized = [entry[1] for entry in stage_log if entry[0] == 'summarize']
+    assert summarized == ['a.mp4.wav.txt', 'c.mp4.wav.txt']
+
+def test_process_videos_bounds_audio_in_flight():
+    """Test conversion waits while too many WAV files are awaiting transcription"""
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def convert(input_path):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        return f"{input_path}.wav"
+
+    def transcribe(audio_path):
+        nonlocal in_flight
+        time.sleep(0.01)  # Transcription is the slow stage
+        with lock:
+            in_flight -= 1
+        return f"{audio_path}.txt"
+
+    with patch('main.convert_stage', side_effect=convert), \
+         patch('main.transcribe_stage', side_effect=transcribe), \
+         patch('main.summarize_stage', return_value=('summary.txt', 'note.md')):
+        assert process_videos([f"{i}.mp4" for i in range(6)]) == []
+
+    assert peak == main.MAX_AUDIO_IN_FLIGHT
+
+def test_process_videos_rejects_duplicate_names(stage_log):
+    """Test inputs whose outputs would overwrite each other are rejected up front"""
+    with pytest.raises(ValueError, match="lec"):
+        process_videos(['a/lec.mp4', 'b/lec.mkv', 'c.mp4'])
+    assert stage_log == []
+
+@pytest.mark.parametrize("value", ["0", "-5"])
+def test_positive_int_rejects_non_positive(value):
+    """Test --max_tokens refuses budgets that would make one-sentence chunks"""
+    with pytest.raises(argparse.ArgumentTypeError):
+        main.positive_int(value)
+    assert main.positive_int("512") == 512
@@ -1,3 +1,4 @@
+import importlib
 import pytest
 from unittest.mock import patch, MagicMock, PropertyMock
 import spacy
@@ -9,6 +10,7 @@ import os
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
+import transcribe.summarize_model
 from transcribe.summarize_model import (
     get_model_and_tokenizer,
     initialize_spacy,
@@ -169,6 +171,26 @@ def test_split_text_large_sentence(mock_model_tokenizer, tmp_path):
                 assert "This is a very long sentence" in chunks[0]
                 assert "This is another sentence" in chunks[1]
 
+def test_split_text_explicit_token_budget(mock_model_tokenizer, mock_spacy, tmp_path):
+    """Test splitting with an explicit per-chunk token budget"""
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("This is sentence one. This is sentence two.")
+
+    with patch('transcribe.summarize_model.count_tokens', return_value=10):
+        chunks = split_text(str(test_file), "Test Title", max_tokens=15)
+        assert chunks == ["This is sentence one.", "This is sentence two."]
+
+def test_split_text_token_budget_capped_by_window(mock_model_tokenizer, mock_spacy, tmp_path):
+    """Test an explicit token budget larger than the window is clamped"""
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("This is sentence one. This is sentence two.")
+
+    # Prompt and each sentence count 15 tokens: 140 - 15 - 100 leaves 25 per chunk
+    with patch('transcribe.summarize_model.count_tokens', return_value=15), \
+         patch('transcribe.summarize_model.settings.WINDOW_SIZE', 140):
+        chunks = split_text(str(test_file), "Test Title", max_tokens=8000)
+        assert chunks == ["This is sentence one.", "This is sentence two."]
+
 def test_summarize_with_mlx_generator_response():
     """Test successful MLX model generation"""
     with patch('transcribe.summarize_model.get_model_and_tokenizer') as mock_get:
@@ -218,16 +240,13 @@ def test_create_summary_prompt_with_chat_template():
 
 def test_init_logging():
     """Test logging initialization"""
-    import importlib
     with patch('logging.getLogger') as mock_logger:
         # Force reload of the module to trigger logger initialization
-        import transcribe.summarize_model
         importlib.reload(transcribe.summarize_model)
         assert mock_logger.called
 
 def test_save_summaries_filesystem_error(tmp_path):
     """Test file system error handling in save_summaries"""
-    from pathlib import Path
     summaries = ["Test summary 1", "Test summary 2"]
     
     with patch('builtins.open') as mock_open:
@@ -32,17 +32,10 @@ def create_logseq_note(summary_path: Path, title: str) -> Optional[Path]:
             logger.error(f"Summary file not found: {summary_path}")
             return None
             
-        # Read summary content
-        with open(summary_path, "r", encoding='utf-8') as f:
-            lines = f.readlines()
-            
-        if not lines:
+        if summary_path.stat().st_size == 0:
             logger.error(f"Summary file is empty: {summary_path}")
             return None
 
-        # Format lines with proper indentation
-        formatted_lines = ["    " + line for line in lines]
-
         # Create logseq note filename and path
         logseq_filename = summary_path.stem + ".md"
         logseq_path = settings.OUTPUT_DIRS["logseq"] / logseq_filename
@@ -50,12 +43,15 @@ def create_logseq_note(summary_path: Path, title: str) -> Optional[Path]:
         # Ensure logseq directory exists
         logseq_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Write logseq note with formatted content
+        # Stream the summary into the note, indenting each line
         try:
-            with open(logseq_path, "w", encoding='utf-8') as f:
-                f.write(f"- summarized [[{title}]]\n")
-                f.write("- [[summary]]\n")
-                f.writelines(formatted_lines)
+            with open(summary_path, "r", encoding='utf-8') as src, \
+                 open(logseq_path, "w", encoding='utf-8') as dst:
+                dst.write(f"- summarized [[{title}]]\n")
+                dst.write("- [[summary]]\n")
+                for line in src:
+                    dst.write("    ")
+                    dst.write(line)
                 
             logger.info(f"Logseq note saved at {logseq_path}")
             return logseq_path
@@ -69,20 +65,22 @@ def create_logseq_note(summary_path: Path, title: str) -> Optional[Path]:
         logger.error(traceback.format_exc())
         return None
 
-def analyze_transcript_content(transcript_path: Path, analyzer: MathLectureAnalyzer) -> Dict:
+def analyze_transcript_content(transcript_path: Path, analyzer: MathLectureAnalyzer, content: Optional[str] = None) -> Dict:
     """
     Analyze transcript content using MathLectureAnalyzer.
     
     Args:
         transcript_path: Path to transcript file
         analyzer: MathLectureAnalyzer instance
+        content: Transcript text if already in memory; read from transcript_path otherwise
         
     Returns:
         Dict containing analysis results
     """
     try:
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if content is None:
+            with open(transcript_path, 'r', encoding='utf-8') as f:
+                content = f.read()
             
         # Perform various analyses
         topic_analysis = analyzer.analyze_topic_relationships(content)
@@ -154,17 +152,15 @@ def process_video(file_path: Path, title: str) -> Dict[str, Path]:
             raise RuntimeError("Failed to create Logseq note")
 
         # Analyze transcript content
-        content_analysis = analyze_transcript_content(Path(transcript_path), analyzer)
+        content_analysis = analyze_transcript_content(Path(transcript_path), analyzer, transcript_text)
 
         # Generate and save stats
         try:
             logger.info(f"Starting stats generation for {title}")
             
-            # Read transcript text to count words
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                transcript_content = f.read()
-                word_count = len(transcript_content.split())
-                logger.info(f"Counted {word_count} words in transcript")
+            # Count words in the transcript text returned by transcribe
+            word_count = len(transcript_text.split())
+            logger.info(f"Counted {word_count} words in transcript")
             
             stats = {
                 'metadata': {
@@ -1,4 +1,5 @@
 import os
+import re
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 import spacy
@@ -10,6 +11,15 @@ from config import settings
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Summary cleanup patterns, compiled once at import
+_BULLET_PREFIX_RE = re.compile(r'^[-*•]?\s*')
+_NUMBERED_PREFIX_RE = re.compile(r'^\d+\.\s*')
+_BULLET_SPACING_RE = re.compile(r'^•\s*')
+_QUOTE_RE = re.compile(r'["""]')
+_OPEN_QUOTE_RE = re.compile(r'(?<!")\s*"')
+_CLOSE_QUOTE_RE = re.compile(r'"\s*(?!")')
+_WHITESPACE_RE = re.compile(r'\s+')
+
 # Global model and tokenizer cache
 model: Any = None
 tokenizer: Any = None
@@ -106,13 +116,14 @@ def count_tokens(text: str) -> int:
         return 0
     return len(tokenizer.encode(text))
 
-def split_text(text_path: str, title: str) -> List[str]:
+def split_text(text_path: str, title: str, max_tokens: Optional[int] = None) -> List[str]:
     """
     Split text into chunks considering the model's context window
     
     Args:
         text_path: Path to text file
         title: Title of the content
+        max_tokens: Token budget per chunk, capped at what fits in WINDOW_SIZE
         
     Returns:
         List[str]: List of text chunks
@@ -121,9 +132,10 @@ def split_text(text_path: str, title: str) -> List[str]:
     if tokenizer is None:
         return []
 
-    # Calculate max tokens for content
+    # Calculate max tokens for content; an explicit budget may not overflow the window
     prompt_tokens = count_tokens(create_summary_prompt("", title))
-    max_tokens = settings.WINDOW_SIZE - prompt_tokens - 100  # Buffer for generation
+    window_budget = settings.WINDOW_SIZE - prompt_tokens - 100  # Buffer for generation
+    max_tokens = window_budget if max_tokens is None else min(max_tokens, window_budget)
 
     # Initialize spaCy
     try:
@@ -176,8 +188,6 @@ def clean_and_format_summary(raw_summary: str) -> str:
     Returns:
         str: Cleaned and formatted summary
     """
-    import re
-    
     # Split into lines and clean up
     lines = raw_summary.strip().split('\n')
     formatted_lines = []
@@ -191,21 +201,21 @@ def clean_and_format_summary(raw_summary: str) -> str:
         
         # Ensure each point starts with a bullet
         if not line.startswith('•'):
-            line = re.sub(r'^[-*•]?\s*', '• ', line)
-            line = re.sub(r'^\d+\.\s*', '• ', line)
+            line = _BULLET_PREFIX_RE.sub('• ', line)
+            line = _NUMBERED_PREFIX_RE.sub('• ', line)
         
         # Ensure consistent spacing after bullet
-        line = re.sub(r'^•\s*', '• ', line)
+        line = _BULLET_SPACING_RE.sub('• ', line)
         
         # Fix quotation marks for consistency
-        line = re.sub(r'["""]', '"', line)
+        line = _QUOTE_RE.sub('"', line)
         
         # Ensure proper spacing around quotes
-        line = re.sub(r'(?<!")\s*"', ' "', line)
-        line = re.sub(r'"\s*(?!")', '" ', line)
+        line = _OPEN_QUOTE_RE.sub(' "', line)
+        line = _CLOSE_QUOTE_RE.sub('" ', line)
         
         # Clean up multiple spaces
-        line = re.sub(r'\s+', ' ', line)
+        line = _WHITESPACE_RE.sub(' ', line)
         
         formatted_lines.append(line)
     
@@ -18,16 +18,10 @@ logger = logging.getLogger(__name__)
 class TranscriptionConfig:
     """Configuration for the transcription service"""
     def __init__(self):
-        self.whisper_path = settings.WHISPER_PATH
+        # Validated once per process by settings on first access
+        self.whisper_path = settings.whisper_path
         self.model_path = settings.WHISPER_MODEL_PATH
-        self.validate()
-
-    def validate(self):
-        """Validate the configuration"""
-        if not os.path.exists(self.whisper_path):
-            raise FileNotFoundError(f"Whisper executable not found at {self.whisper_path}")
-        if not os.path.exists(self.model_path):
-            raise FileNotFoundError(f"Model file not found at {self.model_path}")
+        self.threads = settings.WHISPER_THREADS
 
 def get_filename(file_path: str) -> str:
     """Returns the filename without extension"""
@@ -81,6 +75,7 @@ def transcribe(audio_file: str, output_path: str = "files/transcripts", config:
         logger.info("Transcription config:")
         logger.info(f"  Whisper path: {config.whisper_path}")
         logger.info(f"  Model path: {config.model_path}")
+        logger.info(f"  Threads: {config.threads}")
         logger.info(f"  Audio file: {audio_file}")
 
         start_time = timeit.default_timer()
@@ -92,6 +87,7 @@ def transcribe(audio_file: str, output_path: str = "files/transcripts", config:
             "-m", config.model_path,
             "-f", os.path.abspath(audio_file),  # Use absolute path for audio file
             "-l", "en",
+            "-t", str(config.threads),
             "-np",  # No progress bar
             "-nt"   # No timestamps
         ]